@@ -5,7 +5,6 @@ Handles bot startup, shutdown, and health monitoring
 """
 
 import asyncio
-import signal
 import sys
 import logging
 import time
@@ -13,7 +12,7 @@ from typing import Optional, List
 from datetime import datetime
 
 from trading_bot import TradingBot
-from utils import log_action, log_error
+from utils import log_action, log_error, configure_logging, install_fast_event_loop, install_shutdown_handlers, run_blocking
 
 logger = logging.getLogger(__name__)
 
@@ -142,7 +141,7 @@ class BotRunner:
             if self.bot and self.bot.oanda_client:
                 try:
                     # Simple connection test
-                    account_info = self.bot.oanda_client.get_account_info()
+                    account_info = await run_blocking(self.bot.oanda_client.get_account_info)
                     health_status["oanda_connected"] = True
                     health_status["account_balance"] = account_info.get("balance", 0)
                 except Exception as e:
@@ -180,6 +179,15 @@ async def async_main():
     runner = None
     try:
         runner = BotRunner()
+        
+        # Shutdown signals cancel this task so the runner stops below
+        main_task = asyncio.current_task()
+        
+        def on_shutdown_signal(signum):
+            log_action(f"Shutdown signal received: {signum}")
+            main_task.cancel()
+        
+        install_shutdown_handlers(on_shutdown_signal)
         await runner.start()
     except asyncio.CancelledError:
         log_action("BotRunner: Main cancelled")
@@ -192,19 +200,12 @@ async def async_main():
         raise
 
 def main():
-    """Main entry point with signal handling"""
+    """Main entry point"""
+    configure_logging()
     try:
-        # Set up signal handlers
-        def signal_handler(signum, frame):
-            logger.info(f"Received signal {signum}")
-            log_action(f"Shutdown signal received: {signum}")
-            # The async loop will handle graceful shutdown
-        
-        signal.signal(signal.SIGINT, signal_handler)
-        signal.signal(signal.SIGTERM, signal_handler)
-        signal.signal(signal.SIGHUP, signal_handler)
-        
         log_action("BotRunner: Starting application")
+        if install_fast_event_loop():
+            log_action("BotRunner: Using uvloop event loop")
         asyncio.run(async_main())
         
     except KeyboardInterrupt:
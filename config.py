@@ -1,7 +1,14 @@
 import os
 import json
+import threading
+from collections import deque
 from datetime import datetime, timedelta
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # API Keys and Tokens
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
@@ -9,10 +16,10 @@ OANDA_API_KEY = os.getenv("OANDA_API_KEY")
 OANDA_ACCOUNT_ID = os.getenv("OANDA_ACCOUNT_ID")
 
 # Trading Configuration
-TRADING_PAIRS = [
+TRADING_PAIRS = (
     "EUR_USD", "GBP_USD", "USD_JPY", "USD_CHF", "AUD_USD", 
     "USD_CAD", "NZD_USD", "EUR_GBP", "EUR_JPY", "GBP_JPY"
-]
+)
 
 # Risk Management
 MAX_TRADES_PER_DAY = 15
@@ -63,6 +70,11 @@ NEWS_SCRAPE_INTERVAL = 12 * 60  # 12 minutes
 PRICE_SCAN_INTERVAL = 7  # 7 seconds
 HEARTBEAT_INTERVAL = 5 * 60  # 5 minutes
 LOG_CLEANUP_INTERVAL = 60 * 60  # 1 hour
+TRADE_CHECK_INTERVAL = 1  # 1 second
+STATE_SNAPSHOT_INTERVAL = 60  # 1 minute
+CANDLES_CACHE_TTL = 2 * PRICE_SCAN_INTERVAL  # candles are refreshed by each price scan
+ACCOUNT_SNAPSHOT_TTL = 2.0  # seconds an account/positions snapshot stays fresh
+NOTIFICATION_COALESCE_WINDOW = 0.25  # seconds to batch outgoing Telegram messages
 
 # Market Sessions (UTC)
 ASIA_SESSION = {"start": "00:00", "end": "08:00"}
@@ -83,10 +95,21 @@ TELEGRAM_COMMANDS = {
     "/strategystats": "Strategy performance summary"
 }
 
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096
+
 # File Paths
 STATE_FILE = "bot_state.json"
 LOG_FILE = "trading_log.json"
 ERROR_LOG_FILE = "error_log.json"
+LOG_FLUSH_INTERVAL = 0.2  # seconds between batched log file writes
+LOG_FLUSH_BATCH = 64  # pending records that trigger an early flush
+LOG_RETENTION_DAYS = 7
+TRADE_WAL_FILE = "trades.wal"
+
+# Recent trade history is stored column-wise: one bounded deque per field.
+# The full history lives in the trade WAL and its daily archives.
+TRADE_COLUMNS = ("pair", "side", "units", "price", "confidence", "timestamp")
+MAX_RECENT_TRADES = 500
 
 # Performance Thresholds
 MAX_LATENCY_MS = 1000
@@ -109,23 +132,76 @@ HIGH_IMPACT_EVENTS = [
 
 demo_mode = True
 
+# Last bytes written by save_state, used to skip no-op writes
+_last_saved_state = None
+# Serializes writers so they never share the tmp file concurrently
+_state_write_lock = threading.Lock()
+
+def _json_default(obj):
+    """Serialize deques as lists and anything else unknown as a string"""
+    if isinstance(obj, deque):
+        return list(obj)
+    return str(obj)
+
+def _serialize_state(state):
+    """Serialize state to JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(state, default=_json_default,
+                            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(state, indent=2, default=_json_default).encode()
+
 def load_state():
     """Load bot state from JSON file"""
     try:
-        with open(STATE_FILE, 'r') as f:
-            return json.load(f)
+        with open(STATE_FILE, 'rb') as f:
+            data = f.read()
     except FileNotFoundError:
         return get_default_state()
+    # Fill in keys added since the file was written so callers can index directly
+    state = get_default_state()
+    state.update(orjson.loads(data) if orjson is not None else json.loads(data))
+    return state
+
+def serialize_state(state):
+    """Serialize state to JSON bytes; call on the thread that mutates the state"""
+    return _serialize_state(state)
+
+def write_state_bytes(data):
+    """Atomically write already-serialized state, skipping the write if nothing changed"""
+    global _last_saved_state
+    with _state_write_lock:
+        if data == _last_saved_state:
+            return
+        
+        tmp_file = STATE_FILE + ".tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_file, STATE_FILE)
+        _last_saved_state = data
 
 def save_state(state):
-    """Save bot state to JSON file"""
-    with open(STATE_FILE, 'w') as f:
-        json.dump(state, f, indent=2, default=str)
+    """Save bot state to JSON file atomically, skipping the write if nothing changed"""
+    write_state_bytes(_serialize_state(state))
+
+def empty_trade_columns():
+    """Get an empty column-wise recent trade history"""
+    return {column: deque(maxlen=MAX_RECENT_TRADES) for column in TRADE_COLUMNS}
+
+def trades_to_columns(trades):
+    """Load trades (columns, or a legacy list of dicts) into bounded columns"""
+    if isinstance(trades, dict):
+        return {column: deque(trades.get(column, []), maxlen=MAX_RECENT_TRADES)
+                for column in TRADE_COLUMNS}
+    columns = empty_trade_columns()
+    for trade in trades:
+        for column in TRADE_COLUMNS:
+            columns[column].append(trade.get(column))
+    return columns
 
 def get_default_state():
     """Get default bot state"""
     return {
-        "trades": [],
+        "trades": empty_trade_columns(),
         "open_positions": [],
         "total_pnl": 0.0,
         "win_count": 0,
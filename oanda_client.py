@@ -1,20 +1,39 @@
 import requests
 import json
 import time
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 import logging
 from config import OANDA_API_KEY, OANDA_ACCOUNT_ID
-from telegram_bot import log_error, log_action
+from utils import log_error, log_action, retry_on_failure
 
 logger = logging.getLogger(__name__)
 
+RATE_LIMIT_DEFAULT_WAIT = 60.0  # seconds, when a 429 carries no Retry-After
+SERVER_ERROR_WAIT = 30.0  # seconds to back off after a 5xx
+REQUEST_TIMEOUT = (3.05, 10)  # (connect, read) seconds for API reads
+
+def validate_api_response(response: requests.Response) -> Tuple[bool, float]:
+    """Check an OANDA response; returns (ok, seconds to wait before the next request)"""
+    status = response.status_code
+    if status < 300:
+        return True, 0.0
+    if status == 429:
+        try:
+            return False, float(response.headers.get('Retry-After', RATE_LIMIT_DEFAULT_WAIT))
+        except ValueError:
+            return False, RATE_LIMIT_DEFAULT_WAIT
+    if status >= 500:
+        return False, SERVER_ERROR_WAIT
+    return False, 0.0
+
 class OandaClient:
     def __init__(self):
         self.api_key = OANDA_API_KEY
         self.account_id = OANDA_ACCOUNT_ID
         self.base_url = "https://api-fxpractice.oanda.com"  # Demo account
         self.session = requests.Session()
+        self._backoff_until = 0.0
         self.session.headers.update({
             'Authorization': f'Bearer {self.api_key}',
             'Content-Type': 'application/json'
@@ -26,7 +45,7 @@ class OandaClient:
     def _validate_connection(self):
         """Validate OANDA API connection"""
         try:
-            response = self.session.get(f"{self.base_url}/v3/accounts/{self.account_id}")
+            response = self._get(f"/v3/accounts/{self.account_id}")
             if response.status_code == 200:
                 logger.info("OANDA API connection validated")
                 log_action("OANDA API connection established")
@@ -37,11 +56,29 @@ class OandaClient:
             logger.error(f"OANDA API connection error: {e}")
             log_error("OANDA API connection error", {"error": str(e)})
     
+    def _accept(self, response: requests.Response) -> bool:
+        """Validate a response, recording any rate-limit backoff instead of sleeping on it"""
+        ok, wait = validate_api_response(response)
+        if wait:
+            self._backoff_until = time.monotonic() + wait
+            log_error("OANDA API backing off", {"status_code": response.status_code, "retry_after": wait})
+        return ok
+    
+    @retry_on_failure(max_attempts=3, timeout=30.0,
+                      exceptions=(requests.ConnectionError, requests.Timeout))
+    def _get(self, path: str, params: Optional[Dict[str, Any]] = None) -> requests.Response:
+        """GET an API path, retrying transient network failures (reads only; orders are never retried)"""
+        return self.session.get(f"{self.base_url}{path}", params=params, timeout=REQUEST_TIMEOUT)
+    
+    def retry_after(self) -> float:
+        """Seconds left before the API should be called again; 0 when not backing off"""
+        return max(0.0, self._backoff_until - time.monotonic())
+    
     def get_account_info(self) -> Dict[str, Any]:
         """Get account information"""
         try:
-            response = self.session.get(f"{self.base_url}/v3/accounts/{self.account_id}")
-            if validate_api_response(response):
+            response = self._get(f"/v3/accounts/{self.account_id}")
+            if self._accept(response):
                 data = response.json()
                 return {
                     "balance": float(data['account']['balance']),
@@ -58,8 +95,8 @@ class OandaClient:
     def get_instruments(self) -> List[str]:
         """Get available instruments"""
         try:
-            response = self.session.get(f"{self.base_url}/v3/accounts/{self.account_id}/instruments")
-            if validate_api_response(response):
+            response = self._get(f"/v3/accounts/{self.account_id}/instruments")
+            if self._accept(response):
                 data = response.json()
                 return [instrument['name'] for instrument in data['instruments']]
             return []
@@ -73,9 +110,9 @@ class OandaClient:
             params = {
                 'instruments': ','.join(instruments)
             }
-            response = self.session.get(f"{self.base_url}/v3/accounts/{self.account_id}/pricing", params=params)
+            response = self._get(f"/v3/accounts/{self.account_id}/pricing", params)
             
-            if validate_api_response(response):
+            if self._accept(response):
                 data = response.json()
                 prices = {}
                 
@@ -100,9 +137,9 @@ class OandaClient:
                 'granularity': granularity,
                 'count': count
             }
-            response = self.session.get(f"{self.base_url}/v3/instruments/{instrument}/candles", params=params)
+            response = self._get(f"/v3/instruments/{instrument}/candles", params)
             
-            if validate_api_response(response):
+            if self._accept(response):
                 data = response.json()
                 candles = {
                     'open': [],
@@ -126,6 +163,19 @@ class OandaClient:
             log_error("Failed to get candles", {"error": str(e), "instrument": instrument})
             return {}
     
+    def get_candles_bulk(self, instruments: List[str], granularity: str = "M5",
+                         count: int = 100) -> Dict[str, Dict[str, List[float]]]:
+        """Get candlestick data for several instruments over the shared session"""
+        candles_by_instrument = {}
+        for instrument in instruments:
+            # A 429 mid-batch means every remaining request would be throttled too
+            if self.retry_after():
+                break
+            candles = self.get_candles(instrument, granularity, count)
+            if candles:
+                candles_by_instrument[instrument] = candles
+        return candles_by_instrument
+    
     def place_order(self, instrument: str, units: int, side: str, 
                    stop_loss: Optional[float] = None, take_profit: Optional[float] = None) -> Dict[str, Any]:
         """Place a market order"""
@@ -152,7 +202,7 @@ class OandaClient:
             response = self.session.post(f"{self.base_url}/v3/accounts/{self.account_id}/orders", 
                                        json=order_data)
             
-            if validate_api_response(response):
+            if self._accept(response):
                 data = response.json()
                 order_info = {
                     "order_id": data['orderFillTransaction']['id'],
@@ -198,7 +248,7 @@ class OandaClient:
                     response = self.session.post(f"{self.base_url}/v3/accounts/{self.account_id}/orders", 
                                                json=order_data)
                     
-                    if validate_api_response(response):
+                    if self._accept(response):
                         data = response.json()
                         close_info = {
                             "position_id": position['id'],
@@ -221,9 +271,9 @@ class OandaClient:
     def get_positions(self) -> List[Dict[str, Any]]:
         """Get current positions"""
         try:
-            response = self.session.get(f"{self.base_url}/v3/accounts/{self.account_id}/positions")
+            response = self._get(f"/v3/accounts/{self.account_id}/positions")
             
-            if validate_api_response(response):
+            if self._accept(response):
                 data = response.json()
                 positions = []
                 
@@ -258,9 +308,9 @@ class OandaClient:
         """Get recent trades"""
         try:
             params = {'count': count}
-            response = self.session.get(f"{self.base_url}/v3/accounts/{self.account_id}/trades", params=params)
+            response = self._get(f"/v3/accounts/{self.account_id}/trades", params)
             
-            if validate_api_response(response):
+            if self._accept(response):
                 data = response.json()
                 trades = []
                 
@@ -286,14 +336,7 @@ class OandaClient:
                               stop_loss_pips: int, instrument: str) -> float:
         """Calculate position size based on risk management"""
         try:
-            # Get current price
-            prices = self.get_prices([instrument])
-            if not prices or instrument not in prices:
-                return 0.01  # Minimum position size
-            
-            current_price = prices[instrument]['ask']
-            
-            # Calculate pip value (simplified)
+            # Calculate pip value (simplified); depends only on the quote currency
             if 'JPY' in instrument:
                 pip_value = 0.01
             else:
@@ -315,10 +358,11 @@ class OandaClient:
             log_error("Position size calculation error", {"error": str(e)})
             return 0.01
     
-    def get_spread(self, instrument: str) -> float:
-        """Get current spread for instrument"""
+    def get_spread(self, instrument: str, prices: Optional[Dict[str, Dict[str, Any]]] = None) -> float:
+        """Get current spread for instrument, reusing already-fetched prices when given"""
         try:
-            prices = self.get_prices([instrument])
+            if prices is None:
+                prices = self.get_prices([instrument])
             if instrument in prices:
                 bid = prices[instrument]['bid']
                 ask = prices[instrument]['ask']
@@ -328,10 +372,11 @@ class OandaClient:
             log_error("Spread calculation error", {"error": str(e)})
             return 0.0
     
-    def is_spread_acceptable(self, instrument: str, max_spread_pips: float = 5.0) -> bool:
+    def is_spread_acceptable(self, instrument: str, max_spread_pips: float = 5.0,
+                             prices: Optional[Dict[str, Dict[str, Any]]] = None) -> bool:
         """Check if spread is acceptable for trading"""
         try:
-            spread = self.get_spread(instrument)
+            spread = self.get_spread(instrument, prices)
             
             # Convert to pips
             if 'JPY' in instrument:
@@ -351,19 +396,21 @@ class OandaClient:
             account_info = self.get_account_info()
             positions = self.get_positions()
             
-            summary = f"💰 Account Summary\n"
-            summary += f"Balance: ${account_info.get('balance', 0):.2f}\n"
-            summary += f"Unrealized P&L: ${account_info.get('unrealized_pnl', 0):.2f}\n"
-            summary += f"Realized P&L: ${account_info.get('realized_pnl', 0):.2f}\n"
-            summary += f"Open Positions: {len(positions)}\n"
+            lines = [
+                "💰 Account Summary",
+                f"Balance: ${account_info.get('balance', 0):.2f}",
+                f"Unrealized P&L: ${account_info.get('unrealized_pnl', 0):.2f}",
+                f"Realized P&L: ${account_info.get('realized_pnl', 0):.2f}",
+                f"Open Positions: {len(positions)}",
+            ]
             
             if positions:
-                summary += "\n📊 Open Positions:\n"
+                lines.append("\n📊 Open Positions:")
                 for pos in positions:
                     pnl_emoji = "💰" if pos['unrealized_pnl'] > 0 else "💸"
-                    summary += f"{pnl_emoji} {pos['instrument']}: {pos['units']} units (${pos['unrealized_pnl']:.2f})\n"
+                    lines.append(f"{pnl_emoji} {pos['instrument']}: {pos['units']} units (${pos['unrealized_pnl']:.2f})")
             
-            return summary
+            return "\n".join(lines) + "\n"
             
         except Exception as e:
             return f"❌ Account summary error: {str(e)}"
\ No newline at end of file
@@ -53,3 +53,17 @@ class TechnicalAnalyzer:
             'sell_signal': sell,
             'confidence': min(max((strength + 3) / 6, 0), 1)
         }
+
+def get_comprehensive_analysis(candles):
+    """Run the indicator checks on a candle dict and reduce them to a signal"""
+    signals = TechnicalAnalyzer(pd.DataFrame(candles)).check_signals()
+    confidence = signals['confidence']
+    if signals['buy_signal']:
+        signal = 'buy'
+    elif signals['sell_signal']:
+        # check_signals scores bullishness; a strong sell sits near 0
+        signal = 'sell'
+        confidence = 1 - confidence
+    else:
+        signal = 'neutral'
+    return {'signal': signal, 'confidence': confidence}
@@ -1,15 +1,74 @@
 import asyncio
+import functools
 import logging
+import time
 from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from telegram import Update, Bot
-from telegram.ext import Application, CommandHandler, ContextTypes
-from config import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, TELEGRAM_COMMANDS
-from utils import log_action, log_error, get_recent_logs, format_currency, format_percentage
+from telegram.ext import Application, CommandHandler, ContextTypes, TypeHandler
+from config import (
+    TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, TELEGRAM_COMMANDS, TELEGRAM_MAX_MESSAGE_LENGTH,
+    ACCOUNT_SNAPSHOT_TTL, NOTIFICATION_COALESCE_WINDOW, ASIA_SESSION, LONDON_SESSION, NY_SESSION,
+    demo_mode
+)
+from utils import log_action, log_error, get_recent_logs, format_currency, format_percentage, run_blocking
 from oanda_client import OandaClient
+from technical_analysis import get_comprehensive_analysis
 
 logger = logging.getLogger(__name__)
 
+_NOTIFICATION_SEPARATOR = "\n———\n"
+
+_TRADE_ALERT_TEMPLATE = (
+    "🎯 TRADE ALERT!\n\n"
+    "📊 {instrument}\n"
+    "📈 {side}\n"
+    "💰 {units} units\n"
+    "💵 Price: {price}\n"
+    "🎯 Confidence: {confidence}"
+)
+
+def _format_trade_alert(trade_info: Dict[str, Any]) -> str:
+    """Render a trade alert from the precompiled template"""
+    return _TRADE_ALERT_TEMPLATE.format_map({
+        "instrument": trade_info.get('instrument', 'N/A'),
+        "side": str(trade_info.get('side', 'N/A')).upper(),
+        "units": trade_info.get('units', 0),
+        "price": trade_info.get('price', 0),
+        "confidence": format_percentage(trade_info.get('confidence', 0) * 100)
+    })
+
+_SESSIONS = (("Asia", ASIA_SESSION), ("London", LONDON_SESSION), ("New York", NY_SESSION))
+
+def _classify_hour(hour: int) -> str:
+    """Name the market session(s) open during a UTC hour"""
+    open_sessions = [name for name, window in _SESSIONS
+                     if int(window["start"][:2]) <= hour < int(window["end"][:2])]
+    if not open_sessions:
+        return "Off Hours"
+    if len(open_sessions) == 1:
+        return f"{open_sessions[0]} Session"
+    return f"{'/'.join(open_sessions)} Overlap"
+
+# Session boundaries are whole hours, so a 24-entry table covers every case
+_SESSION_BY_HOUR = tuple(_classify_hour(hour) for hour in range(24))
+
+def handler_errors(name):
+    """Wrap a command handler so failures are reported to the chat and logged"""
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+            try:
+                return await handler(self, update, context)
+            except Exception as e:
+                log_error(f"{name} error", {"error": str(e)})
+                try:
+                    await update.message.reply_text(f"❌ {name} error: {str(e)}")
+                except Exception as reply_error:
+                    log_error(f"{name} error reply failed", {"error": str(reply_error)})
+        return wrapper
+    return decorator
+
 class TelegramBot:
     def __init__(self, oanda_client: OandaClient):
         self.bot_token = TELEGRAM_BOT_TOKEN
@@ -18,6 +77,14 @@ class TelegramBot:
         self.application = None
         self.last_message_time = {}
         
+        # Short-lived account/positions snapshot shared by all handlers
+        self._account_snapshot = None
+        self._snapshot_ts = 0.0
+        
+        # Outgoing notifications coalesced into as few messages as possible
+        self._outbox: List[str] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        
         # Initialize bot
         self._initialize_bot()
     
@@ -26,6 +93,9 @@ class TelegramBot:
         try:
             self.application = Application.builder().token(self.bot_token).build()
             
+            # Stamp every update once before the command handlers run
+            self.application.add_handler(TypeHandler(Update, self._stamp_now), group=-1)
+            
             # Add command handlers
             self.application.add_handler(CommandHandler("start", self.start_command))
             self.application.add_handler(CommandHandler("status", self.status_command))
@@ -47,383 +117,378 @@ class TelegramBot:
             logger.error(f"Failed to initialize Telegram bot: {e}")
             log_error("Telegram bot initialization failed", {"error": str(e)})
     
+    async def _stamp_now(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Record a single UTC timestamp per update for handlers to share"""
+        if context.chat_data is not None:
+            context.chat_data['_now'] = datetime.now(timezone.utc)
+    
+    def _now(self, context: ContextTypes.DEFAULT_TYPE) -> datetime:
+        """Get the timestamp stamped for the current update"""
+        if context.chat_data and '_now' in context.chat_data:
+            return context.chat_data['_now']
+        return datetime.now(timezone.utc)
+    
+    async def _snapshot(self):
+        """Get (account_info, positions), reusing a fresh snapshot when available"""
+        if (self._account_snapshot is not None and
+                time.monotonic() - self._snapshot_ts < ACCOUNT_SNAPSHOT_TTL):
+            return self._account_snapshot
+        
+        account_info, positions = await asyncio.gather(
+            run_blocking(self.oanda_client.get_account_info),
+            run_blocking(self.oanda_client.get_positions)
+        )
+        self._account_snapshot = (account_info, positions)
+        self._snapshot_ts = time.monotonic()
+        return self._account_snapshot
+    
+    def _invalidate_snapshot(self):
+        """Drop the cached snapshot after an action that changes the account"""
+        self._account_snapshot = None
+    
+    @handler_errors("Start command")
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /start command"""
-        try:
-            welcome_message = "🤖 AI Forex Trading Bot Started!\n\n"
-            welcome_message += "Available commands:\n"
-            for command, description in TELEGRAM_COMMANDS.items():
-                welcome_message += f"{command} - {description}\n"
-            
-            await update.message.reply_text(welcome_message)
-            log_action("Telegram start command received")
-            
-        except Exception as e:
-            log_error("Start command error", {"error": str(e)})
+        welcome_message = "🤖 AI Forex Trading Bot Started!\n\n"
+        welcome_message += "Available commands:\n"
+        for command, description in TELEGRAM_COMMANDS.items():
+            welcome_message += f"{command} - {description}\n"
+        
+        await update.message.reply_text(welcome_message)
+        log_action("Telegram start command received")
     
+    @handler_errors("Status command")
     async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /status command - Full diagnostic"""
-        try:
-            # Get account info
-            account_info = self.oanda_client.get_account_info()
-            positions = self.oanda_client.get_positions()
-            
-            # Calculate win rate
-            total_trades = account_info.get('realized_pnl', 0)
-            win_rate = "N/A"  # Placeholder - implement actual calculation
-            
-            status_message = "📊 BOT STATUS REPORT\n\n"
-            status_message += f"💰 Account Balance: {format_currency(account_info.get('balance', 0))}\n"
-            status_message += f"📈 Unrealized P&L: {format_currency(account_info.get('unrealized_pnl', 0))}\n"
-            status_message += f"💵 Realized P&L: {format_currency(account_info.get('realized_pnl', 0))}\n"
-            status_message += f"📊 Open Positions: {len(positions)}\n"
-            status_message += f"🎯 Win Rate: {win_rate}\n\n"
-            
-            # Add recent activity
-            recent_logs = get_recent_logs(5)
-            if recent_logs:
-                status_message += "🔄 Recent Activity:\n"
-                for log in recent_logs[-3:]:
-                    action = log.get('action', 'Unknown')
-                    timestamp = log.get('timestamp', 'Unknown')
-                    status_message += f"• {action} ({timestamp})\n"
-            
-            await update.message.reply_text(status_message)
-            log_action("Status command executed")
-            
-        except Exception as e:
-            error_msg = f"❌ Status command error: {str(e)}"
-            await update.message.reply_text(error_msg)
-            log_error("Status command error", {"error": str(e)})
+        # Get account info
+        account_info, positions = await self._snapshot()
+        
+        # Calculate win rate
+        total_trades = account_info.get('realized_pnl', 0)
+        win_rate = "N/A"  # Placeholder - implement actual calculation
+        
+        status_message = "📊 BOT STATUS REPORT\n\n"
+        status_message += f"💰 Account Balance: {format_currency(account_info.get('balance', 0))}\n"
+        status_message += f"📈 Unrealized P&L: {format_currency(account_info.get('unrealized_pnl', 0))}\n"
+        status_message += f"💵 Realized P&L: {format_currency(account_info.get('realized_pnl', 0))}\n"
+        status_message += f"📊 Open Positions: {len(positions)}\n"
+        status_message += f"🎯 Win Rate: {win_rate}\n\n"
+        
+        # Add recent activity
+        recent_logs = get_recent_logs(5)
+        if recent_logs:
+            status_message += "🔄 Recent Activity:\n"
+            for log in recent_logs[-3:]:
+                action = log.get('action', 'Unknown')
+                timestamp = log.get('timestamp', 'Unknown')
+                status_message += f"• {action} ({timestamp})\n"
+        
+        await update.message.reply_text(status_message)
+        log_action("Status command executed")
     
+    @handler_errors("Trade command")
     async def maketrade_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /maketrade command - Place a trade"""
-        try:
-            # Get account info
-            account_info = self.oanda_client.get_account_info()
-            
-            # Check if we have sufficient balance
-            if account_info.get('balance', 0) < 100:
-                await update.message.reply_text("❌ Insufficient balance for trading")
-                return
-            
-            # Get current prices for major pairs
-            instruments = ["EUR_USD", "GBP_USD", "USD_JPY", "AUD_USD"]
-            prices = self.oanda_client.get_prices(instruments)
-            
-            if not prices:
-                await update.message.reply_text("❌ Unable to get market prices")
-                return
-            
-            # Find best trading opportunity
-            best_trade = None
-            best_confidence = 0.0
-            
-            for instrument in instruments:
-                if instrument in prices:
-                    # Get candlestick data
-                    candles = self.oanda_client.get_candles(instrument)
-                    if not candles:
-                        continue
-                    
-                    # Perform technical analysis
-                    # analysis = self.technical_analyzer.get_comprehensive_analysis(candles)
-                    
-                    # Check spread
-                    if not self.oanda_client.is_spread_acceptable(instrument):
-                        continue
-                    
-                    # Calculate overall confidence
-                    # technical_confidence = analysis.get('confidence', 0.0)
-                    
-                    # if technical_confidence > best_confidence and technical_confidence > 0.6:
-                    #     best_confidence = technical_confidence
-                    #     best_trade = {
-                    #         'instrument': instrument,
-                    #         'signal': analysis.get('signal', 'neutral'),
-                    #         'confidence': best_confidence,
-                    #         'price': prices[instrument]['ask'],
-                    #         'analysis': analysis
-                    #     }
-            
-            if not best_trade:
-                await update.message.reply_text("❌ No suitable trading opportunities found")
-                return
-            
-            # Place the trade
-            instrument = best_trade['instrument']
-            signal = best_trade['signal']
-            confidence = best_trade['confidence']
-            price = best_trade['price']
-            
-            # Calculate position size
-            position_size = self.oanda_client.calculate_position_size(
-                account_info.get('balance', 0), 2.0, 50, instrument
-            )
-            
-            # Determine trade direction
-            if signal == "buy":
-                units = position_size
-                side = "buy"
-            elif signal == "sell":
-                units = -position_size
-                side = "sell"
-            else:
-                await update.message.reply_text("❌ No clear signal for trading")
-                return
-            
-            # Place order
-            order_result = self.oanda_client.place_order(instrument, units, side)
-            
-            if order_result:
-                trade_message = f"🎯 TRADE EXECUTED!\n\n"
-                trade_message += f"📊 Instrument: {instrument}\n"
-                trade_message += f"📈 Direction: {side.upper()}\n"
-                trade_message += f"💰 Units: {units}\n"
-                trade_message += f"💵 Price: {price}\n"
-                trade_message += f"🎯 Confidence: {format_percentage(confidence * 100)}\n"
-                trade_message += f"⏰ Time: {datetime.now().strftime('%H:%M:%S')}"
-                
-                await update.message.reply_text(trade_message)
-                log_action("Manual trade executed", order_result)
-            else:
-                await update.message.reply_text("❌ Failed to place trade")
-                
-        except Exception as e:
-            error_msg = f"❌ Trade command error: {str(e)}"
-            await update.message.reply_text(error_msg)
-            log_error("Trade command error", {"error": str(e)})
+        # Get account info
+        account_info, _ = await self._snapshot()
+        
+        # Check if we have sufficient balance
+        if account_info.get('balance', 0) < 100:
+            await update.message.reply_text("❌ Insufficient balance for trading")
+            return
+        
+        # Get current prices for major pairs
+        instruments = ["EUR_USD", "GBP_USD", "USD_JPY", "AUD_USD"]
+        prices = await run_blocking(self.oanda_client.get_prices, instruments)
+        
+        if not prices:
+            await update.message.reply_text("❌ Unable to get market prices")
+            return
+        
+        # Collect candidate trades, then pick the most confident one
+        candidates = []
+        for instrument in instruments:
+            if instrument not in prices:
+                continue
+            
+            # Check spread against the prices fetched above (no extra round trip)
+            if not self.oanda_client.is_spread_acceptable(instrument, prices=prices):
+                continue
+            
+            # Get candlestick data
+            candles = await run_blocking(self.oanda_client.get_candles, instrument)
+            if not candles:
+                continue
+            
+            # Perform technical analysis off the loop (pandas)
+            analysis = await run_blocking(get_comprehensive_analysis, candles)
+            technical_confidence = analysis['confidence']
+            if technical_confidence > 0.6 and analysis['signal'] != 'neutral':
+                candidates.append((technical_confidence, instrument, analysis))
+        
+        best_trade = max(candidates, key=lambda candidate: candidate[0], default=None)
+        if best_trade is None:
+            await update.message.reply_text("❌ No suitable trading opportunities found")
+            return
+        
+        # Place the trade
+        confidence, instrument, analysis = best_trade
+        signal = analysis['signal']
+        price = prices[instrument]['ask']
+        
+        # Calculate position size
+        position_size = self.oanda_client.calculate_position_size(
+            account_info.get('balance', 0), 2.0, 50, instrument
+        )
+        
+        # Determine trade direction
+        if signal == "buy":
+            units = position_size
+            side = "buy"
+        elif signal == "sell":
+            units = -position_size
+            side = "sell"
+        else:
+            await update.message.reply_text("❌ No clear signal for trading")
+            return
+        
+        # Orders are only ever sent in demo mode, as in the trading loop
+        if not demo_mode:
+            logger.warning("Live trading blocked in demo mode.")
+            await update.message.reply_text("❌ Live trading is blocked; manual trades run in demo mode only")
+            return
+        
+        # Place order
+        order_result = await run_blocking(self.oanda_client.place_order, instrument, units, side)
+        self._invalidate_snapshot()
+        
+        if order_result:
+            trade_message = f"🎯 TRADE EXECUTED!\n\n"
+            trade_message += f"📊 Instrument: {instrument}\n"
+            trade_message += f"📈 Direction: {side.upper()}\n"
+            trade_message += f"💰 Units: {units}\n"
+            trade_message += f"💵 Price: {price}\n"
+            trade_message += f"🎯 Confidence: {format_percentage(confidence * 100)}\n"
+            trade_message += f"⏰ Time: {self._now(context).astimezone().strftime('%H:%M:%S')}"
+            
+            await update.message.reply_text(trade_message)
+            log_action("Manual trade executed", order_result)
+        else:
+            await update.message.reply_text("❌ Failed to place trade")
     
+    @handler_errors("Whatyoudoin command")
     async def whatyoudoin_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /whatyoudoin command - Show current action"""
-        try:
-            # Get recent logs to determine current activity
-            recent_logs = get_recent_logs(3)
-            
-            if recent_logs:
-                latest_action = recent_logs[-1].get('action', 'Idle')
-                timestamp = recent_logs[-1].get('timestamp', 'Unknown')
-                
-                status_message = f"🤖 Current Bot Status:\n\n"
-                status_message += f"🔄 Last Action: {latest_action}\n"
-                status_message += f"⏰ Time: {timestamp}\n"
-                status_message += f"💻 Status: Active and Monitoring\n"
-                status_message += f"📊 Market Session: {self._get_market_session()}"
-            else:
-                status_message = "🤖 Bot Status: Idle - No recent activity"
-            
-            await update.message.reply_text(status_message)
-            log_action("Whatyoudoin command executed")
-            
-        except Exception as e:
-            error_msg = f"❌ Status command error: {str(e)}"
-            await update.message.reply_text(error_msg)
-            log_error("Whatyoudoin command error", {"error": str(e)})
+        # Get recent logs to determine current activity
+        recent_logs = get_recent_logs(3)
+        
+        if recent_logs:
+            latest_action = recent_logs[-1].get('action', 'Idle')
+            timestamp = recent_logs[-1].get('timestamp', 'Unknown')
+            
+            status_message = f"🤖 Current Bot Status:\n\n"
+            status_message += f"🔄 Last Action: {latest_action}\n"
+            status_message += f"⏰ Time: {timestamp}\n"
+            status_message += f"💻 Status: Active and Monitoring\n"
+            status_message += f"📊 Market Session: {self._get_market_session(self._now(context))}"
+        else:
+            status_message = "🤖 Bot Status: Idle - No recent activity"
+        
+        await update.message.reply_text(status_message)
+        log_action("Whatyoudoin command executed")
     
+    @handler_errors("Cancel trade")
     async def canceltrade_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /canceltrade command - Close all positions"""
-        try:
-            positions = self.oanda_client.get_positions()
-            
-            if not positions:
-                await update.message.reply_text("✅ No open positions to close")
-                return
-            
-            closed_count = 0
-            for position in positions:
-                close_result = self.oanda_client.close_position(position['instrument'])
-                if close_result:
-                    closed_count += 1
-            
-            if closed_count > 0:
-                message = f"✅ Closed {closed_count} position(s)\n"
-                message += "🛑 Trading halted - All positions closed"
-                await update.message.reply_text(message)
-                log_action("All positions closed manually", {"closed_count": closed_count})
-            else:
-                await update.message.reply_text("❌ Failed to close positions")
-                
-        except Exception as e:
-            error_msg = f"❌ Cancel trade error: {str(e)}"
-            await update.message.reply_text(error_msg)
-            log_error("Cancel trade error", {"error": str(e)})
+        # Always fetch fresh: a cached list can miss a position the loop just opened
+        positions = await run_blocking(self.oanda_client.get_positions)
+        
+        if not positions:
+            await update.message.reply_text("✅ No open positions to close")
+            return
+        
+        closed_count = 0
+        for position in positions:
+            close_result = await run_blocking(self.oanda_client.close_position, position['instrument'])
+            if close_result:
+                closed_count += 1
+        self._invalidate_snapshot()
+        
+        if closed_count > 0:
+            message = f"✅ Closed {closed_count} position(s)\n"
+            message += "🛑 Trading halted - All positions closed"
+            await update.message.reply_text(message)
+            log_action("All positions closed manually", {"closed_count": closed_count})
+        else:
+            await update.message.reply_text("❌ Failed to close positions")
     
+    @handler_errors("Showlog")
     async def showlog_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /showlog command - Show recent logs"""
-        try:
-            recent_logs = get_recent_logs(20)
-            
-            if not recent_logs:
-                await update.message.reply_text("📝 No recent logs available")
-                return
-            
-            log_message = "📝 Recent Bot Activity:\n\n"
-            
-            for log in recent_logs[-10:]:  # Show last 10 logs
-                action = log.get('action', 'Unknown')
-                timestamp = log.get('timestamp', 'Unknown')
-                level = log.get('level', 'INFO')
-                
-                # Format timestamp
-                try:
-                    dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                    formatted_time = dt.strftime('%H:%M:%S')
-                except:
-                    formatted_time = timestamp
-                
-                emoji = "🟢" if level == "INFO" else "🟡" if level == "WARNING" else "🔴"
-                log_message += f"{emoji} {formatted_time}: {action}\n"
-            
-            await update.message.reply_text(log_message)
-            log_action("Showlog command executed")
-            
-        except Exception as e:
-            error_msg = f"❌ Showlog error: {str(e)}"
-            await update.message.reply_text(error_msg)
-            log_error("Showlog error", {"error": str(e)})
+        recent_logs = get_recent_logs(20)
+        
+        if not recent_logs:
+            await update.message.reply_text("📝 No recent logs available")
+            return
+        
+        log_message = "📝 Recent Bot Activity:\n\n"
+        
+        for log in recent_logs[-10:]:  # Show last 10 logs
+            action = log.get('action', 'Unknown')
+            timestamp = log.get('timestamp', 'Unknown')
+            level = log.get('level', 'INFO')
+            
+            # Format timestamp
+            try:
+                dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+                formatted_time = dt.strftime('%H:%M:%S')
+            except:
+                formatted_time = timestamp
+            
+            emoji = "🟢" if level == "INFO" else "🟡" if level == "WARNING" else "🔴"
+            log_message += f"{emoji} {formatted_time}: {action}\n"
+        
+        await update.message.reply_text(log_message)
+        log_action("Showlog command executed")
     
+    @handler_errors("Toggle mode")
     async def togglemode_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /togglemode command - Toggle trading mode"""
-        try:
-            # This would typically update a global state
-            # For now, just acknowledge the command
-            await update.message.reply_text("🔄 Trading mode toggle acknowledged\n(Implementation pending)")
-            log_action("Togglemode command executed")
-            
-        except Exception as e:
-            error_msg = f"❌ Toggle mode error: {str(e)}"
-            await update.message.reply_text(error_msg)
-            log_error("Toggle mode error", {"error": str(e)})
+        # This would typically update a global state
+        # For now, just acknowledge the command
+        await update.message.reply_text("🔄 Trading mode toggle acknowledged\n(Implementation pending)")
+        log_action("Togglemode command executed")
     
+    @handler_errors("Reset bot")
     async def resetbot_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /resetbot command - Reset bot state"""
-        try:
-            # Close all positions
-            positions = self.oanda_client.get_positions()
-            for position in positions:
-                self.oanda_client.close_position(position['instrument'])
-            
-            await update.message.reply_text("🔄 Bot reset completed\nAll positions closed\nState reset")
-            log_action("Bot reset command executed")
-            
-        except Exception as e:
-            error_msg = f"❌ Reset bot error: {str(e)}"
-            await update.message.reply_text(error_msg)
-            log_error("Reset bot error", {"error": str(e)})
+        # Close all positions, fetched fresh rather than from the snapshot
+        positions = await run_blocking(self.oanda_client.get_positions)
+        for position in positions:
+            await run_blocking(self.oanda_client.close_position, position['instrument'])
+        self._invalidate_snapshot()
+        
+        await update.message.reply_text("🔄 Bot reset completed\nAll positions closed\nState reset")
+        log_action("Bot reset command executed")
     
+    @handler_errors("Pnl")
     async def pnl_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /pnl command - Show P&L"""
-        try:
-            account_info = self.oanda_client.get_account_info()
-            
-            balance = account_info.get('balance', 0)
-            unrealized_pnl = account_info.get('unrealized_pnl', 0)
-            realized_pnl = account_info.get('realized_pnl', 0)
-            
-            total_pnl = unrealized_pnl + realized_pnl
-            
-            pnl_message = "💰 P&L Summary\n\n"
-            pnl_message += f"💵 Balance: {format_currency(balance)}\n"
-            pnl_message += f"📈 Unrealized P&L: {format_currency(unrealized_pnl)}\n"
-            pnl_message += f"💵 Realized P&L: {format_currency(realized_pnl)}\n"
-            pnl_message += f"📊 Total P&L: {format_currency(total_pnl)}"
-            
-            await update.message.reply_text(pnl_message)
-            log_action("Pnl command executed")
-            
-        except Exception as e:
-            error_msg = f"❌ P&L error: {str(e)}"
-            await update.message.reply_text(error_msg)
-            log_error("Pnl error", {"error": str(e)})
+        account_info, _ = await self._snapshot()
+        
+        balance = account_info.get('balance', 0)
+        unrealized_pnl = account_info.get('unrealized_pnl', 0)
+        realized_pnl = account_info.get('realized_pnl', 0)
+        
+        total_pnl = unrealized_pnl + realized_pnl
+        
+        pnl_message = "💰 P&L Summary\n\n"
+        pnl_message += f"💵 Balance: {format_currency(balance)}\n"
+        pnl_message += f"📈 Unrealized P&L: {format_currency(unrealized_pnl)}\n"
+        pnl_message += f"💵 Realized P&L: {format_currency(realized_pnl)}\n"
+        pnl_message += f"📊 Total P&L: {format_currency(total_pnl)}"
+        
+        await update.message.reply_text(pnl_message)
+        log_action("Pnl command executed")
     
+    @handler_errors("Open positions")
     async def openpositions_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /openpositions command - Show open positions"""
-        try:
-            positions = self.oanda_client.get_positions()
-            
-            if not positions:
-                await update.message.reply_text("📊 No open positions")
-                return
-            
-            positions_message = "📊 Open Positions:\n\n"
-            
-            for position in positions:
-                instrument = position['instrument']
-                units = position['units']
-                side = position['side']
-                pnl = position['unrealized_pnl']
-                
-                emoji = "🟢" if pnl > 0 else "🔴"
-                side_emoji = "📈" if side == "long" else "📉"
-                
-                positions_message += f"{emoji} {side_emoji} {instrument}\n"
-                positions_message += f"   Units: {units}\n"
-                positions_message += f"   P&L: {format_currency(pnl)}\n\n"
-            
-            await update.message.reply_text(positions_message)
-            log_action("Openpositions command executed")
-            
-        except Exception as e:
-            error_msg = f"❌ Open positions error: {str(e)}"
-            await update.message.reply_text(error_msg)
-            log_error("Open positions error", {"error": str(e)})
+        _, positions = await self._snapshot()
+        
+        if not positions:
+            await update.message.reply_text("📊 No open positions")
+            return
+        
+        positions_message = "📊 Open Positions:\n\n"
+        
+        for position in positions:
+            instrument = position['instrument']
+            units = position['units']
+            side = position['side']
+            pnl = position['unrealized_pnl']
+            
+            emoji = "🟢" if pnl > 0 else "🔴"
+            side_emoji = "📈" if side == "long" else "📉"
+            
+            positions_message += f"{emoji} {side_emoji} {instrument}\n"
+            positions_message += f"   Units: {units}\n"
+            positions_message += f"   P&L: {format_currency(pnl)}\n\n"
+        
+        await update.message.reply_text(positions_message)
+        log_action("Openpositions command executed")
     
+    @handler_errors("Strategy stats")
     async def strategystats_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /strategystats command - Show strategy performance"""
-        try:
-            # This would show strategy performance statistics
-            # For now, show a placeholder
-            stats_message = "📊 Strategy Performance\n\n"
-            stats_message += "🎯 Win Rate: 65%\n"
-            stats_message += "📈 Average Win: $25.50\n"
-            stats_message += "📉 Average Loss: $15.30\n"
-            stats_message += "💰 Profit Factor: 1.67\n"
-            stats_message += "🔄 Total Trades: 47\n"
-            stats_message += "⏰ Best Strategy: RSI + MACD\n"
-            
-            await update.message.reply_text(stats_message)
-            log_action("Strategystats command executed")
-            
-        except Exception as e:
-            error_msg = f"❌ Strategy stats error: {str(e)}"
-            await update.message.reply_text(error_msg)
-            log_error("Strategy stats error", {"error": str(e)})
+        # This would show strategy performance statistics
+        # For now, show a placeholder
+        stats_message = "📊 Strategy Performance\n\n"
+        stats_message += "🎯 Win Rate: 65%\n"
+        stats_message += "📈 Average Win: $25.50\n"
+        stats_message += "📉 Average Loss: $15.30\n"
+        stats_message += "💰 Profit Factor: 1.67\n"
+        stats_message += "🔄 Total Trades: 47\n"
+        stats_message += "⏰ Best Strategy: RSI + MACD\n"
+        
+        await update.message.reply_text(stats_message)
+        log_action("Strategystats command executed")
     
+    @handler_errors("Help")
     async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /help command - Show help"""
-        try:
-            help_message = "🤖 AI Forex Trading Bot Help\n\n"
-            help_message += "Available Commands:\n\n"
-            
-            for command, description in TELEGRAM_COMMANDS.items():
-                help_message += f"{command} - {description}\n"
-            
-            help_message += "\n📞 For support, contact the bot administrator"
-            
-            await update.message.reply_text(help_message)
-            log_action("Help command executed")
-            
-        except Exception as e:
-            error_msg = f"❌ Help error: {str(e)}"
-            await update.message.reply_text(error_msg)
-            log_error("Help error", {"error": str(e)})
+        help_message = "🤖 AI Forex Trading Bot Help\n\n"
+        help_message += "Available Commands:\n\n"
+        
+        for command, description in TELEGRAM_COMMANDS.items():
+            help_message += f"{command} - {description}\n"
+        
+        help_message += "\n📞 For support, contact the bot administrator"
+        
+        await update.message.reply_text(help_message)
+        log_action("Help command executed")
     
-    def _get_market_session(self) -> str:
+    def _get_market_session(self, now: Optional[datetime] = None) -> str:
         """Get current market session"""
-        now = datetime.utcnow()
-        hour = now.hour
-        
-        if 0 <= hour < 8:
-            return "Asia Session"
-        elif 8 <= hour < 16:
-            return "London Session"
-        elif 13 <= hour < 21:
-            return "New York Session"
-        else:
-            return "Off Hours"
+        if now is None:
+            now = datetime.now(timezone.utc)
+        return _SESSION_BY_HOUR[now.hour]
     
     async def send_notification(self, message: str):
-        """Send notification to Telegram"""
+        """Queue a notification; bursts within the coalesce window go out as one message"""
+        if not self.application:
+            return
+        
+        self._outbox.append(message)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_outbox())
+    
+    async def _flush_outbox(self):
+        """Drain the outbox in order, one coalesce window at a time"""
+        # Keep going while sends were in flight so nothing queued meanwhile is stranded
+        while self._outbox:
+            await asyncio.sleep(NOTIFICATION_COALESCE_WINDOW)
+            batch, self._outbox = self._outbox, []
+            
+            # Stay under Telegram's per-message length limit
+            chunk = ""
+            for message in batch:
+                candidate = f"{chunk}{_NOTIFICATION_SEPARATOR}{message}" if chunk else message
+                if chunk and len(candidate) > TELEGRAM_MAX_MESSAGE_LENGTH:
+                    await self._send_message(chunk)
+                    chunk = message
+                else:
+                    chunk = candidate
+            if chunk:
+                await self._send_message(chunk)
+    
+    async def drain_notifications(self):
+        """Wait for queued notifications to go out; called on shutdown"""
+        if self._flush_task is not None and not self._flush_task.done():
+            await self._flush_task
+    
+    async def _send_message(self, message: str):
+        """Send a single message to the configured chat"""
         try:
             if self.application:
                 await self.application.bot.send_message(
@@ -441,11 +506,10 @@ class TelegramBot:
             if self.application:
                 # This is a fallback for synchronous contexts
                 # In the new async implementation, this should not be used
-                import asyncio
                 loop = asyncio.new_event_loop()
                 asyncio.set_event_loop(loop)
                 try:
-                    loop.run_until_complete(self.send_notification(message))
+                    loop.run_until_complete(self._send_message(message))
                 finally:
                     loop.close()
         except Exception as e:
@@ -454,12 +518,7 @@ class TelegramBot:
     async def send_trade_alert(self, trade_info: Dict[str, Any]):
         """Send trade alert to Telegram"""
         try:
-            alert_message = f"🎯 TRADE ALERT!\n\n"
-            alert_message += f"📊 {trade_info.get('instrument', 'N/A')}\n"
-            alert_message += f"📈 {trade_info.get('side', 'N/A').upper()}\n"
-            alert_message += f"💰 {trade_info.get('units', 0)} units\n"
-            alert_message += f"💵 Price: {trade_info.get('price', 0)}\n"
-            alert_message += f"🎯 Confidence: {format_percentage(trade_info.get('confidence', 0) * 100)}"
+            alert_message = _format_trade_alert(trade_info)
             
             await self.send_notification(alert_message)
             
@@ -469,12 +528,7 @@ class TelegramBot:
     def send_trade_alert_sync(self, trade_info: Dict[str, Any]):
         """Send trade alert to Telegram (synchronous wrapper for compatibility)"""
         try:
-            alert_message = f"🎯 TRADE ALERT!\n\n"
-            alert_message += f"📊 {trade_info.get('instrument', 'N/A')}\n"
-            alert_message += f"📈 {trade_info.get('side', 'N/A').upper()}\n"
-            alert_message += f"💰 {trade_info.get('units', 0)} units\n"
-            alert_message += f"💵 Price: {trade_info.get('price', 0)}\n"
-            alert_message += f"🎯 Confidence: {format_percentage(trade_info.get('confidence', 0) * 100)}"
+            alert_message = _format_trade_alert(trade_info)
             
             self.send_notification_sync(alert_message)
             
@@ -1,38 +1,106 @@
 import asyncio
+import gzip
+import heapq
+import json
+import os
+import shutil
 import time
 import threading
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Any, Optional
 import logging
-import signal
 import sys
 
 from config import (
     TRADING_PAIRS, NEWS_SCRAPE_INTERVAL, PRICE_SCAN_INTERVAL, 
-    HEARTBEAT_INTERVAL, LOG_CLEANUP_INTERVAL, validate_config,
-    load_state, save_state, get_default_state, demo_mode
+    HEARTBEAT_INTERVAL, LOG_CLEANUP_INTERVAL, TRADE_CHECK_INTERVAL, CANDLES_CACHE_TTL,
+    STATE_SNAPSHOT_INTERVAL, TRADE_WAL_FILE, MAX_TRADES_PER_DAY, MAX_LOSS_STREAK, validate_config,
+    load_state, save_state, serialize_state, write_state_bytes, get_default_state, trades_to_columns, TRADE_COLUMNS, demo_mode
 )
 from telegram_bot import log_action, log_error
+from utils import cleanup_old_logs, configure_logging, install_fast_event_loop, install_shutdown_handlers, run_blocking
 from oanda_client import OandaClient
-from technical_analysis import TechnicalAnalyzer
+from technical_analysis import get_comprehensive_analysis
 from telegram_bot import TelegramBot
 
 logger = logging.getLogger(__name__)
 
+HOUR_SECONDS = 60 * 60
+NS_PER_SECOND = 1_000_000_000
+TRADE_COOLDOWN_SECONDS = 300  # 5 minutes minimum between trades
+
+# Trade gate bits: trading is allowed only while no bit is set
+GATE_DISABLED = 1
+GATE_DAILY_LIMIT = 2
+GATE_LOSS_STREAK = 4
+GATE_OFF_HOURS = 8
+GATE_COOLDOWN = 16
+
+# Bit h set = trading allowed during UTC hour h (02:00-22:59)
+TRADE_HOURS_MASK = sum(1 << hour for hour in range(2, 23))
+
+# Signal -> direction of the order; 0 means no trade
+SIGNAL_SIGN = {'buy': 1, 'sell': -1, 'neutral': 0}
+
+def _seconds_until_midnight(min_seconds: float = 0) -> float:
+    """Seconds until the first local midnight at least min_seconds from now"""
+    now = datetime.now()
+    earliest = now + timedelta(seconds=min_seconds)
+    midnight = datetime.combine(earliest.date() + timedelta(days=1), datetime.min.time())
+    return (midnight - now).total_seconds()
+
+def _compress_file(path: str):
+    """Gzip a file next to itself and remove the original"""
+    try:
+        # 'x' refuses to clobber an existing archive
+        with open(path, 'rb') as src, gzip.open(path + '.gz', 'xb') as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(path)
+    except Exception as e:
+        log_error("Failed to compress archive", {"path": path, "error": str(e)})
+
+def _unused_archive_name(day: str) -> str:
+    """trades-YYYYMMDD.log, suffixed -1, -2, ... if that day already has an archive"""
+    name = f"trades-{day}.log"
+    suffix = 0
+    while os.path.exists(name) or os.path.exists(name + '.gz'):
+        suffix += 1
+        name = f"trades-{day}-{suffix}.log"
+    return name
+
 class TradingBot:
     def __init__(self):
         self.is_running = False
         self.state = load_state()
+        self.state['trades'] = trades_to_columns(self.state.get('trades', []))
+        self._wal = self._open_trade_wal()
         self.oanda_client = None
-        self.technical_analyzer = None
         self.telegram_bot = None
         
         # Performance tracking
         self.daily_trades = 0
         self.daily_pnl = 0.0
-        self.last_trade_time = None
         self.consecutive_losses = 0
         
+        # Conditions blocking trading, kept up to date as their inputs change
+        self._trade_gate_mask = 0
+        self._set_gate(GATE_DISABLED, not self.state.get('is_trading', True))
+        self._update_off_hours_gate()
+        
+        # Candles fetched by the price scan, reused by the strategy until stale
+        self._candles_cache: Dict[str, Dict[str, List[float]]] = {}
+        self._candles_cache_ts = 0.0
+        
+        # Dedicated worker so log rotation never runs on the event loop thread
+        self._io_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='logrotate')
+        # State writes get their own worker so a long prune or gzip never delays them
+        self._state_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='state')
+        
+        # Long-lived loop for running coroutines from synchronous code
+        self._bg_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._bg_thread: Optional[threading.Thread] = None
+        
         # Initialize components
         self._initialize_components()
     
@@ -42,17 +110,14 @@ class TradingBot:
             # Validate configuration
             validate_config()
             
+            # Start the background event loop
+            self._start_background_loop()
+            
             # Initialize OANDA client
             self.oanda_client = OandaClient()
             
-            # Initialize technical analyzer
-            self.technical_analyzer = TechnicalAnalyzer()
-            
             # Initialize Telegram bot
-            self.telegram_bot = TelegramBot(
-                self.oanda_client, 
-                self.technical_analyzer
-            )
+            self.telegram_bot = TelegramBot(self.oanda_client)
             
             log_action("Trading bot components initialized successfully")
             
@@ -60,6 +125,89 @@ class TradingBot:
             log_error("Failed to initialize trading bot components", {"error": str(e)})
             raise
     
+    def _open_trade_wal(self):
+        """Replay trades newer than the last snapshot, then open the WAL for appends"""
+        if os.path.exists(TRADE_WAL_FILE):
+            timestamps = self.state['trades']['timestamp']
+            last_known = timestamps[-1] if timestamps else ""
+            replayed = 0
+            with open(TRADE_WAL_FILE, 'rb') as f:
+                for line in f:
+                    try:
+                        trade_info = json.loads(line)
+                    except ValueError:
+                        continue  # torn final line from a crash
+                    if str(trade_info.get('timestamp', "")) > last_known:
+                        self._append_trade_columns(trade_info)
+                        replayed += 1
+            if replayed:
+                log_action("Replayed trades from WAL", {"count": replayed})
+        
+        return open(TRADE_WAL_FILE, 'ab', buffering=0)
+    
+    def _record_trade(self, trade_info: Dict[str, Any]):
+        """Append a trade to the WAL (full history) and the bounded in-memory columns"""
+        self._wal.write(json.dumps(trade_info, default=str).encode() + b'\n')
+        self._append_trade_columns(trade_info)
+    
+    def _append_trade_columns(self, trade_info: Dict[str, Any]):
+        """Append one trade's fields to the column-wise trade history"""
+        trades = self.state['trades']
+        for column in TRADE_COLUMNS:
+            trades[column].append(trade_info.get(column))
+    
+    def _write_snapshot(self):
+        """Persist the state, including the recent trades window"""
+        save_state(self.state)
+    
+    def _wal_first_day(self) -> Optional[str]:
+        """YYYYMMDD of the WAL's first record, or None if it holds no trades"""
+        with open(TRADE_WAL_FILE, 'rb') as f:
+            for line in f:
+                try:
+                    timestamp = json.loads(line).get('timestamp')
+                except ValueError:
+                    continue
+                if timestamp:
+                    return str(timestamp)[:10].replace('-', '')
+        return None
+    
+    def _rotate_trade_wal(self):
+        """Archive the WAL under the date of its first trade and compress it off-thread"""
+        self._wal.close()
+        day = self._wal_first_day()
+        if day is not None:
+            archive = _unused_archive_name(day)
+            os.replace(TRADE_WAL_FILE, archive)
+            self._io_executor.submit(_compress_file, archive)
+        self._wal = open(TRADE_WAL_FILE, 'ab', buffering=0)
+    
+    async def _snapshot_state_async(self):
+        """Periodic state snapshot"""
+        try:
+            # Serialize here, where the state is mutated; only the bytes go to the writer
+            data = serialize_state(self.state)
+            await asyncio.get_running_loop().run_in_executor(self._state_executor, write_state_bytes, data)
+        except Exception as e:
+            log_error("State snapshot error", {"error": str(e)})
+    
+    def _start_background_loop(self):
+        """Start a daemon thread running an event loop for the bot's lifetime"""
+        self._bg_loop = asyncio.new_event_loop()
+        self._bg_thread = threading.Thread(
+            target=self._bg_loop.run_forever, name="bot-bg-loop", daemon=True
+        )
+        self._bg_thread.start()
+    
+    def _stop_background_loop(self):
+        """Stop the background event loop"""
+        if self._bg_loop and self._bg_loop.is_running():
+            self._bg_loop.call_soon_threadsafe(self._bg_loop.stop)
+    
+    def _sync(self, coro, timeout: Optional[float] = None):
+        """Run a coroutine on the background loop from sync code and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self._bg_loop).result(timeout=timeout)
+    
     def start(self):
         """Start the trading bot"""
         try:
@@ -67,7 +215,7 @@ class TradingBot:
             log_action("Trading bot started")
             
             # Start main trading loop
-            self._run_trading_loop()
+            asyncio.run(self._run_trading_loop_async())
             
         except KeyboardInterrupt:
             self.stop()
@@ -76,53 +224,51 @@ class TradingBot:
             self.stop()
     
     def stop(self):
-        """Stop the trading bot"""
+        """Stop the trading bot from sync code"""
         try:
-            self.is_running = False
-            log_action("Trading bot stopping...")
-            
-            # Close all positions
-            if self.oanda_client:
-                try:
-                    positions = self.oanda_client.get_positions()
-                    for position in positions:
-                        self.oanda_client.close_position(position['instrument'])
-                except Exception as e:
-                    log_error("Error closing positions during shutdown", {"error": str(e)})
-            
-            # Save final state
-            try:
-                save_state(self.state)
-            except Exception as e:
-                log_error("Error saving state during shutdown", {"error": str(e)})
-            
-            log_action("Trading bot stopped successfully")
-            
+            self._sync(self.stop_async())
         except Exception as e:
             log_error("Error stopping trading bot", {"error": str(e)})
+        finally:
+            self._stop_background_loop()
     
     async def stop_async(self):
-        """Stop the trading bot (async version)"""
+        """Stop the trading bot"""
         try:
             self.is_running = False
-            log_action("Trading bot stopping (async)...")
+            log_action("Trading bot stopping...")
             
             # Close all positions
             if self.oanda_client:
                 try:
-                    positions = self.oanda_client.get_positions()
+                    positions = await run_blocking(self.oanda_client.get_positions)
                     for position in positions:
-                        self.oanda_client.close_position(position['instrument'])
+                        await run_blocking(self.oanda_client.close_position, position['instrument'])
                 except Exception as e:
                     log_error("Error closing positions during async shutdown", {"error": str(e)})
             
-            # Save final state
+            # Deliver queued notifications before the loop goes away
+            if self.telegram_bot:
+                try:
+                    await self.telegram_bot.drain_notifications()
+                except Exception as e:
+                    log_error("Error flushing notifications during async shutdown", {"error": str(e)})
+            
+            # Save final state, after any queued snapshot so it can't land on top
             try:
-                save_state(self.state)
+                await run_blocking(self._state_executor.shutdown, wait=True)
+                self._write_snapshot()
             except Exception as e:
                 log_error("Error saving state during async shutdown", {"error": str(e)})
             
-            log_action("Trading bot stopped successfully (async)")
+            # Release the WAL and let a pending archive compression finish
+            try:
+                self._wal.close()
+                await run_blocking(self._io_executor.shutdown, wait=True)
+            except Exception as e:
+                log_error("Error closing trade WAL during async shutdown", {"error": str(e)})
+            
+            log_action("Trading bot stopped successfully")
             
         except Exception as e:
             log_error("Error stopping trading bot (async)", {"error": str(e)})
@@ -132,8 +278,6 @@ class TradingBot:
         try:
             if self.telegram_bot:
                 # Create a new event loop for the Telegram bot thread
-                import threading
-                
                 def run_telegram_bot():
                     try:
                         loop = asyncio.new_event_loop()
@@ -149,333 +293,209 @@ class TradingBot:
         except Exception as e:
             log_error("Telegram bot start error", {"error": str(e)})
     
-    def _run_trading_loop(self):
-        """Main trading loop (synchronous version)"""
-        log_action("Starting main trading loop")
-        
-        # Schedule periodic tasks
-        schedule.every(NEWS_SCRAPE_INTERVAL).seconds.do(self._scrape_news)
-        schedule.every(PRICE_SCAN_INTERVAL).seconds.do(self._scan_prices)
-        schedule.every(HEARTBEAT_INTERVAL).seconds.do(self._send_heartbeat)
-        schedule.every(LOG_CLEANUP_INTERVAL).seconds.do(self._cleanup_logs)
-        
-        # Schedule daily reset
-        schedule.every().day.at("00:00").do(self._daily_reset)
-        
-        while self.is_running:
-            try:
-                # Run scheduled tasks
-                schedule.run_pending()
-                
-                # Check for trading opportunities
-                if self._should_trade():
-                    self._execute_trading_strategy()
-                
-                # Small delay to prevent excessive CPU usage
-                time.sleep(1)
-                
-            except Exception as e:
-                log_error("Trading loop error", {"error": str(e)})
-                time.sleep(5)  # Wait before retrying
-    
     async def _run_trading_loop_async(self):
-        """Main trading loop (async version)"""
+        """Main trading loop - sleeps until the next periodic job is due"""
         log_action("Starting async main trading loop")
         
-        # Track last execution times for periodic tasks
-        last_news_scrape = 0
-        last_price_scan = 0
-        last_heartbeat = 0
-        last_cleanup = 0
+        # Min-heap of (due_ns, seq, interval_ns, name, job); seq breaks ties.
+        # interval_ns None marks daily_reset, which re-arms to the next local midnight.
+        now = time.monotonic_ns()
+        jobs = [
+            ("news_scrape", NEWS_SCRAPE_INTERVAL, self._scrape_news_async),
+            ("price_scan", PRICE_SCAN_INTERVAL, self._scan_prices_async),
+            ("heartbeat", HEARTBEAT_INTERVAL, self._send_heartbeat_async),
+            ("log_cleanup", LOG_CLEANUP_INTERVAL, self._cleanup_logs_async),
+            ("trading", TRADE_CHECK_INTERVAL, self._check_trading_opportunities_async),
+            ("state_snapshot", STATE_SNAPSHOT_INTERVAL, self._snapshot_state_async),
+        ]
+        schedule = [(now, seq, int(interval * NS_PER_SECOND), name, job)
+                    for seq, (name, interval, job) in enumerate(jobs)]
+        schedule.append((now + int(_seconds_until_midnight() * NS_PER_SECOND), len(schedule),
+                         None, "daily_reset", self._daily_reset))
+        schedule.append((now + int((HOUR_SECONDS - time.time() % HOUR_SECONDS) * NS_PER_SECOND), len(schedule),
+                         HOUR_SECONDS * NS_PER_SECOND, "off_hours_gate", self._refresh_off_hours_gate))
+        heapq.heapify(schedule)
+        running: Dict[str, asyncio.Task] = {}
         
-        while self.is_running:
-            try:
-                current_time = time.time()
-                
-                # Run periodic tasks based on intervals
-                if current_time - last_news_scrape >= NEWS_SCRAPE_INTERVAL:
-                    await self._scrape_news_async()
-                    last_news_scrape = current_time
-                
-                if current_time - last_price_scan >= PRICE_SCAN_INTERVAL:
-                    await self._scan_prices_async()
-                    last_price_scan = current_time
-                
-                if current_time - last_heartbeat >= HEARTBEAT_INTERVAL:
-                    await self._send_heartbeat_async()
-                    last_heartbeat = current_time
-                
-                if current_time - last_cleanup >= LOG_CLEANUP_INTERVAL:
-                    await self._cleanup_logs_async()
-                    last_cleanup = current_time
-                
-                # Check for trading opportunities
-                if self._should_trade():
-                    await self._execute_trading_strategy_async()
-                
-                # Small delay to prevent excessive CPU usage
-                await asyncio.sleep(1)
-                
-            except asyncio.CancelledError:
-                log_action("Async trading loop cancelled")
-                break
-            except Exception as e:
-                log_error("Async trading loop error", {"error": str(e)})
-                await asyncio.sleep(5)  # Wait before retrying
+        try:
+            while self.is_running:
+                try:
+                    due, seq, interval, name, job = schedule[0]
+                    delay = due - time.monotonic_ns()
+                    if delay > 0:
+                        await asyncio.sleep(delay / NS_PER_SECOND)
+                        continue
+                    
+                    now = time.monotonic_ns()
+                    if interval is None:
+                        # Realign to the wall clock so DST changes don't shift the reset;
+                        # the hour margin skips a midnight this run fired just ahead of
+                        next_due = now + int(_seconds_until_midnight(HOUR_SECONDS) * NS_PER_SECOND)
+                    else:
+                        # Reschedule from the due time; resync if we fell behind
+                        next_due = due + interval
+                        if next_due < now:
+                            next_due = now + interval
+                    heapq.heapreplace(schedule, (next_due, seq, interval, name, job))
+                    
+                    # Skip this run if the previous one is still in flight
+                    task = running.get(name)
+                    if task is None or task.done():
+                        running[name] = asyncio.create_task(job())
+                    
+                except asyncio.CancelledError:
+                    log_action("Async trading loop cancelled")
+                    break
+                except Exception as e:
+                    log_error("Async trading loop error", {"error": str(e)})
+                    await asyncio.sleep(5)  # Wait before retrying
+        finally:
+            for task in running.values():
+                if not task.done():
+                    task.cancel()
+    
+    async def _check_trading_opportunities_async(self):
+        """Run the trading strategy when trading conditions allow"""
+        if self._should_trade():
+            await self._execute_trading_strategy_async()
     
     def _should_trade(self) -> bool:
-        """Check if we should trade based on various conditions"""
+        """Check if we should trade - every blocking condition is a bit in the gate mask"""
+        return not self._trade_gate_mask
+    
+    def _set_gate(self, bit: int, active: bool):
+        """Set or clear one trade gate bit"""
+        if active:
+            self._trade_gate_mask |= bit
+        else:
+            self._trade_gate_mask &= ~bit
+    
+    def _update_off_hours_gate(self):
+        """Block trading during low-liquidity hours (UTC)"""
+        hour = datetime.now(timezone.utc).hour
+        self._set_gate(GATE_OFF_HOURS, not (TRADE_HOURS_MASK >> hour) & 1)
+    
+    async def _refresh_off_hours_gate(self):
+        """Hourly job keeping the off-hours gate current"""
+        self._update_off_hours_gate()
+    
+    def _on_trade_placed(self):
+        """Update counters and gates after an order fills"""
+        self.daily_trades += 1
+        self._set_gate(GATE_DAILY_LIMIT, self.daily_trades >= MAX_TRADES_PER_DAY)
+        
+        # Block trading until the cooldown timer clears the gate
+        self._set_gate(GATE_COOLDOWN, True)
         try:
-            # Check if trading is enabled
-            if not self.state.get('is_trading', True):
-                return False
-            
-            # Check daily trade limit
-            if self.daily_trades >= 15:
-                return False
-            
-            # Check consecutive losses
-            if self.consecutive_losses >= 3:
-                log_action("Trading paused due to consecutive losses")
-                return False
-            
-            # Check time-based restrictions
-            now = datetime.utcnow()
-            hour = now.hour
-            
-            # Avoid trading during low-liquidity hours
-            if hour < 2 or hour > 22:
-                return False
-            
-            # Check if enough time has passed since last trade
-            if self.last_trade_time:
-                time_since_last_trade = (now - self.last_trade_time).total_seconds()
-                if time_since_last_trade < 300:  # 5 minutes minimum between trades
-                    return False
-            
-            return True
-            
-        except Exception as e:
-            log_error("Error checking trade conditions", {"error": str(e)})
-            return False
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = self._bg_loop
+        loop.call_soon_threadsafe(loop.call_later, TRADE_COOLDOWN_SECONDS,
+                                  self._set_gate, GATE_COOLDOWN, False)
     
-    def _execute_trading_strategy(self):
+    async def _execute_trading_strategy_async(self):
         """Execute the main trading strategy"""
+        # Sit out ticks while OANDA has asked us to back off
+        if self.oanda_client.retry_after():
+            return
+        
         try:
             # Get account information
-            account_info = self.oanda_client.get_account_info()
+            account_info = await run_blocking(self.oanda_client.get_account_info)
             if not account_info or account_info.get('balance', 0) < 100:
                 return
             
             # Get current prices for all trading pairs
-            prices = self.oanda_client.get_prices(TRADING_PAIRS)
+            prices = await run_blocking(self.oanda_client.get_prices, TRADING_PAIRS)
             if not prices:
                 return
             
-            # Analyze each pair for trading opportunities
-            best_opportunity = None
-            best_confidence = 0.0
-            
-            for pair in TRADING_PAIRS:
-                if pair not in prices:
-                    continue
-                
-                # Check spread
-                if not self.oanda_client.is_spread_acceptable(pair):
-                    continue
-                
-                # Get candlestick data
-                candles = self.oanda_client.get_candles(pair)
-                if not candles or len(candles.get('close', [])) < 50:
-                    continue
-                
-                # Perform technical analysis
-                technical_analysis = self.technical_analyzer.get_comprehensive_analysis(candles)
-                
-                # Calculate overall confidence
-                technical_confidence = technical_analysis.get('confidence', 0.0)
-                
-                # Check if this is a good opportunity
-                if (technical_confidence > best_confidence and 
-                    technical_confidence > 0.6 and 
-                    technical_analysis.get('signal') != 'neutral'):
-                    
-                    best_confidence = technical_confidence
-                    best_opportunity = {
-                        'pair': pair,
-                        'signal': technical_analysis.get('signal'),
-                        'confidence': best_confidence,
-                        'price': prices[pair]['ask'],
-                        'technical_analysis': technical_analysis
-                    }
-            
-            # Execute trade if we found a good opportunity
-            if best_opportunity and best_confidence > 0.7:
-                self._execute_trade(best_opportunity)
-            
-        except Exception as e:
-            log_error("Trading strategy execution error", {"error": str(e)})
-    
-    async def _execute_trading_strategy_async(self):
-        """Execute the main trading strategy (async version)"""
-        try:
-            # Get account information
-            account_info = self.oanda_client.get_account_info()
-            if not account_info or account_info.get('balance', 0) < 100:
-                return
+            # Only pairs that came back with a price are worth analyzing; config order
+            # keeps tie-breaking between equal confidences the same on every run
+            pairs = tuple(pair for pair in TRADING_PAIRS if pair in prices)
             
-            # Get current prices for all trading pairs
-            prices = self.oanda_client.get_prices(TRADING_PAIRS)
-            if not prices:
-                return
+            # Analyze all pairs concurrently so their candle fetches overlap
+            results = await asyncio.gather(
+                *(self._evaluate_pair(pair, prices) for pair in pairs),
+                return_exceptions=True
+            )
             
-            # Analyze each pair for trading opportunities
             best_opportunity = None
-            best_confidence = 0.0
-            
-            for pair in TRADING_PAIRS:
-                if pair not in prices:
-                    continue
-                
-                # Check spread
-                if not self.oanda_client.is_spread_acceptable(pair):
-                    continue
-                
-                # Get candlestick data
-                candles = self.oanda_client.get_candles(pair)
-                if not candles or len(candles.get('close', [])) < 50:
-                    continue
-                
-                # Perform technical analysis
-                technical_analysis = self.technical_analyzer.get_comprehensive_analysis(candles)
-                
-                # Calculate overall confidence
-                technical_confidence = technical_analysis.get('confidence', 0.0)
-                
-                # Check if this is a good opportunity
-                if (technical_confidence > best_confidence and 
-                    technical_confidence > 0.6 and 
-                    technical_analysis.get('signal') != 'neutral'):
-                    
-                    best_confidence = technical_confidence
-                    best_opportunity = {
-                        'pair': pair,
-                        'signal': technical_analysis.get('signal'),
-                        'confidence': best_confidence,
-                        'price': prices[pair]['ask'],
-                        'technical_analysis': technical_analysis
-                    }
+            for pair, result in zip(pairs, results):
+                if isinstance(result, BaseException):
+                    log_error("Pair evaluation error", {"pair": pair, "error": str(result)})
+                elif result and (best_opportunity is None or
+                                 result['confidence'] > best_opportunity['confidence']):
+                    best_opportunity = result
             
             # Execute trade if we found a good opportunity
-            if best_opportunity and best_confidence > 0.7:
+            if best_opportunity and best_opportunity['confidence'] > 0.7:
                 await self._execute_trade_async(best_opportunity)
             
         except Exception as e:
             log_error("Async trading strategy execution error", {"error": str(e)})
     
-    def _execute_trade(self, opportunity: Dict[str, Any]):
-        """Execute a trade based on the opportunity"""
-        try:
-            pair = opportunity['pair']
-            signal = opportunity['signal']
-            confidence = opportunity['confidence']
-            price = opportunity['price']
-            
-            # Get account info for position sizing
-            account_info = self.oanda_client.get_account_info()
-            balance = account_info.get('balance', 0)
-            
-            # Calculate position size
-            position_size = self.oanda_client.calculate_position_size(
-                balance, 2.0, 50, pair
-            )
-            
-            # Determine trade direction and units
-            if signal == "buy":
-                units = position_size
-                side = "buy"
-            elif signal == "sell":
-                units = -position_size
-                side = "sell"
-            else:
-                return
-            
-            if demo_mode:
-                # Only allow demo trades
-                order_result = self.oanda_client.place_order(pair, units, side)
-                if order_result:
-                    # Update tracking variables
-                    self.daily_trades += 1
-                    self.last_trade_time = datetime.now()
-                    
-                    # Log the trade
-                    trade_info = {
-                        'pair': pair,
-                        'side': side,
-                        'units': units,
-                        'price': price,
-                        'confidence': confidence,
-                        'timestamp': datetime.now().isoformat()
-                    }
-                    
-                    log_action("Trade executed", trade_info)
-                    
-                    # Send Telegram notification
-                    if self.telegram_bot:
-                        try:
-                            # Create a new event loop for the notification
-                            loop = asyncio.new_event_loop()
-                            asyncio.set_event_loop(loop)
-                            loop.run_until_complete(self.telegram_bot.send_trade_alert(trade_info))
-                            loop.close()
-                        except Exception as e:
-                            log_error("Failed to send trade alert", {"error": str(e)})
-                    
-                    # Update state
-                    self.state['trades'].append(trade_info)
-                    save_state(self.state)
-                else:
-                    log_error("Demo trade execution failed", {"pair": pair, "side": side, "units": units})
-            else:
-                logger.warning("Live trading blocked in demo mode.")
-            
-        except Exception as e:
-            log_error("Trade execution error", {"error": str(e)})
+    def _cached_candles(self, pair: str) -> Optional[Dict[str, List[float]]]:
+        """Get candles from the price-scan cache, or None if missing or stale"""
+        if time.monotonic() - self._candles_cache_ts > CANDLES_CACHE_TTL:
+            return None
+        return self._candles_cache.get(pair)
+    
+    async def _evaluate_pair(self, pair: str, prices: Dict[str, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Analyze a pair present in prices and return a trading opportunity, or None"""
+        # Check spread against this tick's prices (no per-pair refetch)
+        if not self.oanda_client.is_spread_acceptable(pair, prices=prices):
+            return None
+        
+        # Get candlestick data, fetching without blocking the loop on a cache miss
+        candles = self._cached_candles(pair)
+        if not candles:
+            candles = await run_blocking(self.oanda_client.get_candles, pair)
+        if not candles or len(candles.get('close', [])) < 50:
+            return None
+        
+        # Perform technical analysis off the loop so gathered pairs overlap the pandas work
+        technical_analysis = await run_blocking(get_comprehensive_analysis, candles)
+        technical_confidence = technical_analysis.get('confidence', 0.0)
+        
+        # Check if this is a good opportunity
+        if technical_confidence <= 0.6 or technical_analysis.get('signal') == 'neutral':
+            return None
+        
+        return {
+            'pair': pair,
+            'signal': technical_analysis.get('signal'),
+            'confidence': technical_confidence,
+            'price': prices[pair]['ask'],
+            'technical_analysis': technical_analysis
+        }
     
     async def _execute_trade_async(self, opportunity: Dict[str, Any]):
-        """Execute a trade based on the opportunity (async version)"""
+        """Execute a trade based on the opportunity"""
         try:
             pair = opportunity['pair']
-            signal = opportunity['signal']
+            sign = SIGNAL_SIGN.get(opportunity['signal'], 0)
+            if not sign:
+                return
+            side = 'buy' if sign > 0 else 'sell'
             confidence = opportunity['confidence']
             price = opportunity['price']
             
             # Get account info for position sizing
-            account_info = self.oanda_client.get_account_info()
+            account_info = await run_blocking(self.oanda_client.get_account_info)
             balance = account_info.get('balance', 0)
             
             # Calculate position size
-            position_size = self.oanda_client.calculate_position_size(
-                balance, 2.0, 50, pair
-            )
+            position_size = self.oanda_client.calculate_position_size(balance, 2.0, 50, pair)
             
-            # Determine trade direction and units
-            if signal == "buy":
-                units = position_size
-                side = "buy"
-            elif signal == "sell":
-                units = -position_size
-                side = "sell"
-            else:
-                return
+            units = sign * position_size
             
             if demo_mode:
                 # Only allow demo trades
-                order_result = self.oanda_client.place_order(pair, units, side)
+                order_result = await run_blocking(self.oanda_client.place_order, pair, units, side)
                 if order_result:
                     # Update tracking variables
-                    self.daily_trades += 1
-                    self.last_trade_time = datetime.now()
+                    self._on_trade_placed()
                     
                     # Log the trade
                     trade_info = {
@@ -494,8 +514,7 @@ class TradingBot:
                         await self.telegram_bot.send_trade_alert(trade_info)
                     
                     # Update state
-                    self.state['trades'].append(trade_info)
-                    save_state(self.state)
+                    self._record_trade(trade_info)
                 else:
                     log_error("Demo trade execution failed", {"pair": pair, "side": side, "units": units})
             else:
@@ -504,123 +523,72 @@ class TradingBot:
         except Exception as e:
             log_error("Async trade execution error", {"error": str(e)})
     
-    def _scrape_news(self):
-        """Scrape and analyze news"""
-        try:
-            log_action("Starting news scraping")
-            
-            # Update state with sentiment
-            self.state['last_news_scrape'] = datetime.now().isoformat()
-            save_state(self.state)
-            
-            log_action("News scraping completed")
-            
-        except Exception as e:
-            log_error("News scraping error", {"error": str(e)})
-    
     async def _scrape_news_async(self):
-        """Scrape and analyze news (async version)"""
-        try:
-            log_action("Starting async news scraping")
-            
-            # Update state with sentiment
-            self.state['last_news_scrape'] = datetime.now().isoformat()
-            save_state(self.state)
-            
-            log_action("Async news scraping completed")
-            
-        except Exception as e:
-            log_error("Async news scraping error", {"error": str(e)})
-    
-    def _scan_prices(self):
-        """Scan market prices"""
-        try:
-            log_action("Starting price scan")
-            
-            # Get current prices
-            prices = self.oanda_client.get_prices(TRADING_PAIRS)
-            
-            # Update state
-            self.state['last_price_scan'] = datetime.now().isoformat()
-            save_state(self.state)
-            
-            log_action("Price scan completed", {"pairs_scanned": len(prices)})
-            
-        except Exception as e:
-            log_error("Price scan error", {"error": str(e)})
+        """Scrape and analyze news"""
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Starting async news scraping")
+        
+        # Update state with sentiment
+        self.state['last_news_scrape'] = datetime.now().isoformat()
+        await self._snapshot_state_async()
     
     async def _scan_prices_async(self):
-        """Scan market prices (async version)"""
+        """Scan market prices"""
+        if self.oanda_client.retry_after():
+            return
+        
         try:
-            log_action("Starting async price scan")
-            
-            # Get current prices
-            prices = self.oanda_client.get_prices(TRADING_PAIRS)
-            
-            # Update state
-            self.state['last_price_scan'] = datetime.now().isoformat()
-            save_state(self.state)
-            
-            log_action("Async price scan completed", {"pairs_scanned": len(prices)})
+            prices = await run_blocking(self.oanda_client.get_prices, TRADING_PAIRS)
             
+            # Refresh the candles cache for the strategy
+            self._candles_cache = await run_blocking(self.oanda_client.get_candles_bulk, TRADING_PAIRS)
+            self._candles_cache_ts = time.monotonic()
         except Exception as e:
             log_error("Async price scan error", {"error": str(e)})
-    
-    def _send_heartbeat(self):
-        """Send heartbeat to Telegram"""
-        try:
-            if self.telegram_bot:
-                heartbeat_message = f"💓 Bot Heartbeat - {datetime.now().strftime('%H:%M:%S')}"
-                try:
-                    # Create a new event loop for the notification
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    loop.run_until_complete(self.telegram_bot.send_notification(heartbeat_message))
-                    loop.close()
-                except Exception as e:
-                    log_error("Failed to send heartbeat", {"error": str(e)})
-            
-            self.state['last_heartbeat'] = datetime.now().isoformat()
-            save_state(self.state)
-            
-        except Exception as e:
-            log_error("Heartbeat error", {"error": str(e)})
+            return
+        
+        # Update state
+        self.state['last_price_scan'] = datetime.now().isoformat()
+        await self._snapshot_state_async()
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Async price scan completed: %d pairs", len(prices))
     
     async def _send_heartbeat_async(self):
-        """Send heartbeat to Telegram (async version)"""
-        try:
-            if self.telegram_bot:
-                heartbeat_message = f"💓 Bot Heartbeat - {datetime.now().strftime('%H:%M:%S')}"
+        """Send heartbeat to Telegram"""
+        if self.telegram_bot:
+            heartbeat_message = f"💓 Bot Heartbeat - {datetime.now().strftime('%H:%M:%S')}"
+            try:
                 await self.telegram_bot.send_notification(heartbeat_message)
-            
-            self.state['last_heartbeat'] = datetime.now().isoformat()
-            save_state(self.state)
-            
-        except Exception as e:
-            log_error("Async heartbeat error", {"error": str(e)})
-    
-    def _cleanup_logs(self):
-        """Clean up old log files"""
-        try:
-            cleanup_old_logs()
-            log_action("Log cleanup completed")
-        except Exception as e:
-            log_error("Log cleanup error", {"error": str(e)})
+            except Exception as e:
+                log_error("Async heartbeat error", {"error": str(e)})
+        
+        self.state['last_heartbeat'] = datetime.now().isoformat()
+        await self._snapshot_state_async()
     
     async def _cleanup_logs_async(self):
-        """Clean up old log files (async version)"""
+        """Clean up old log files"""
         try:
-            cleanup_old_logs()
-            log_action("Async log cleanup completed")
+            await asyncio.get_running_loop().run_in_executor(self._io_executor, cleanup_old_logs)
         except Exception as e:
             log_error("Async log cleanup error", {"error": str(e)})
+            return
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Async log cleanup completed")
     
-    def _daily_reset(self):
+    async def _daily_reset(self):
         """Reset daily counters"""
         try:
             self.daily_trades = 0
             self.daily_pnl = 0.0
             self.consecutive_losses = 0
+            self._set_gate(GATE_DAILY_LIMIT | GATE_LOSS_STREAK, False)
+            
+            # Snapshot first so startup replay never needs the archived WAL; same
+            # worker as the periodic writes so a queued older one can't land after it
+            data = serialize_state(self.state)
+            await asyncio.get_running_loop().run_in_executor(self._state_executor, write_state_bytes, data)
+            self._rotate_trade_wal()
             
             log_action("Daily reset completed")
             
@@ -641,16 +609,17 @@ class TradingBot:
             else:
                 self.consecutive_losses = 0
             
-            # Update win rate
+            if self.consecutive_losses >= MAX_LOSS_STREAK and not self._trade_gate_mask & GATE_LOSS_STREAK:
+                log_action("Trading paused due to consecutive losses")
+            self._set_gate(GATE_LOSS_STREAK, self.consecutive_losses >= MAX_LOSS_STREAK)
+            
+            # Update win rate and total P&L; the periodic snapshot persists them
+            state = self.state
             if pnl > 0:
-                self.state['win_count'] = self.state.get('win_count', 0) + 1
+                state['win_count'] += 1
             else:
-                self.state['loss_count'] = self.state.get('loss_count', 0) + 1
-            
-            # Update total P&L
-            self.state['total_pnl'] = self.state.get('total_pnl', 0) + pnl
-            
-            save_state(self.state)
+                state['loss_count'] += 1
+            state['total_pnl'] += pnl
             
         except Exception as e:
             log_error("Performance metrics update error", {"error": str(e)})
@@ -662,7 +631,17 @@ async def async_main():
     try:
         # Create and start the trading bot
         bot = TradingBot()
-        main.bot = bot  # Store reference for signal handler
+        main.bot = bot  # Store reference for interrupt handling in main()
+        
+        # Wake the loop on shutdown signals and unwind through the cancel path below
+        main_task = asyncio.current_task()
+        
+        def on_shutdown_signal(signum):
+            log_action(f"Shutdown signal received: {signum}")
+            bot.is_running = False
+            main_task.cancel()
+        
+        install_shutdown_handlers(on_shutdown_signal)
         
         log_action("Starting trading bot in async mode")
         
@@ -682,13 +661,8 @@ async def async_main():
         tasks.append(trading_task)
         
         # Wait for all tasks to complete (they should run indefinitely)
-        if tasks:
-            log_action(f"Running {len(tasks)} async tasks")
-            await asyncio.gather(*tasks, return_exceptions=True)
-        else:
-            log_action("No async tasks available, falling back to synchronous mode")
-            # Fallback to synchronous trading loop if no async tasks
-            bot._run_trading_loop()
+        log_action(f"Running {len(tasks)} async tasks")
+        await asyncio.gather(*tasks, return_exceptions=True)
         
     except asyncio.CancelledError:
         log_action("Async main cancelled")
@@ -717,22 +691,13 @@ async def async_main():
 
 def main():
     """Main entry point"""
+    configure_logging()
     try:
-        # Set up signal handlers for graceful shutdown
-        def signal_handler(signum, frame):
-            logger.info(f"Received shutdown signal {signum}")
-            log_action(f"Shutdown signal received: {signum}")
-            # Graceful shutdown - set the bot to stop
-            if hasattr(main, 'bot') and main.bot:
-                main.bot.is_running = False
-            # The async loop will handle the actual shutdown
-        
-        signal.signal(signal.SIGINT, signal_handler)
-        signal.signal(signal.SIGTERM, signal_handler)
-        signal.signal(signal.SIGHUP, signal_handler)  # For systemd reload
-        
         log_action("Starting trading bot application")
         
+        if install_fast_event_loop():
+            log_action("Using uvloop event loop")
+        
         # Run the async main function - this will block until completion
         asyncio.run(async_main())
         
@@ -1,26 +1,288 @@
+import asyncio
+import atexit
+import json
 import logging
-from datetime import datetime
+import logging.handlers
+import math
+import mmap
+import os
+import queue
+import random
+import shutil
+import signal
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from functools import lru_cache, partial, wraps
+
+from config import LOG_FILE, ERROR_LOG_FILE, LOG_FLUSH_INTERVAL, LOG_FLUSH_BATCH, LOG_RETENTION_DAYS
+
+try:
+    import orjson
+    
+    def _dumps(obj):
+        try:
+            return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # orjson rejects e.g. integers wider than 64 bits; json handles them
+            return json.dumps(obj, default=str).encode()
+    
+    _loads = orjson.loads
+except ImportError:
+    orjson = None
+    
+    def _dumps(obj):
+        return json.dumps(obj, default=str).encode()
+    
+    _loads = json.loads
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
 logger = logging.getLogger(__name__)
 
+# JSON-lines log records are queued here as encoded bytes and appended to
+# their file in batches by a daemon thread, through handles opened once.
+_log_queues = {LOG_FILE: deque(), ERROR_LOG_FILE: deque()}
+_log_lock = threading.Lock()
+_log_flush_lock = threading.RLock()
+_log_handles = {}
+_log_wakeup = threading.Event()
+
+# (millisecond, iso_text) of the last formatted timestamp; swapped as one tuple
+_iso_cache = (0, "")
+
+def _now_iso():
+    """Current local time in ISO format, reformatted at most once per millisecond"""
+    global _iso_cache
+    ns = time.time_ns()
+    cached_ms, text = _iso_cache
+    # Compare for inequality so a wall clock stepped backwards refreshes too
+    if ns // 1_000_000 != cached_ms:
+        # Fixed-width microseconds keep timestamps byte-comparable
+        text = datetime.fromtimestamp(ns / 1e9).isoformat(timespec='microseconds')
+        _iso_cache = (ns // 1_000_000, text)
+    return text
+
+def _enqueue_log(path, entry):
+    try:
+        payload = _dumps(entry) + b"\n"
+    except (TypeError, ValueError):
+        # Never let an unencodable details payload escape into the caller
+        payload = _dumps({key: str(value) for key, value in entry.items()}) + b"\n"
+    with _log_lock:
+        log_queue = _log_queues[path]
+        log_queue.append(payload)
+        pending = len(log_queue)
+    if pending >= LOG_FLUSH_BATCH:
+        _log_wakeup.set()
+
+def _flush_logs():
+    """Write every queued log record to its file, one write per file"""
+    with _log_flush_lock:
+        for path, log_queue in _log_queues.items():
+            with _log_lock:
+                if not log_queue:
+                    continue
+                batch = b"".join(log_queue)
+                log_queue.clear()
+            try:
+                fh = _log_handles.get(path)
+                if fh is None:
+                    fh = _log_handles[path] = open(path, 'ab')
+                fh.write(batch)
+                fh.flush()
+            except OSError as e:
+                logger.error(f"Failed to write {path}: {e}")
+
+def _log_flusher():
+    while True:
+        _log_wakeup.wait(LOG_FLUSH_INTERVAL)
+        _log_wakeup.clear()
+        _flush_logs()
+
+threading.Thread(target=_log_flusher, name="log-flusher", daemon=True).start()
+atexit.register(_flush_logs)
+
 def log_action(action, details=None):
     msg = f"ACTION: {action}"
     if details:
         msg += f" | Details: {details}"
     logger.info(msg)
+    _enqueue_log(LOG_FILE, {"timestamp": _now_iso(), "action": action, "details": details})
 
 def log_error(error, details=None):
     msg = f"ERROR: {error}"
     if details:
         msg += f" | Details: {details}"
     logger.error(msg)
+    _enqueue_log(ERROR_LOG_FILE, {"timestamp": _now_iso(), "error": error, "details": details})
+
+def _line_timestamp(line):
+    """Slice the timestamp value out of an encoded log line without parsing it"""
+    key = line.find(b'"timestamp"')
+    if key < 0:
+        return None
+    start = line.find(b'"', key + 11) + 1
+    end = line.find(b'"', start)
+    if start <= 0 or end < 0:
+        return None
+    return line[start:end]
+
+def _prune_log_file(path, cutoff):
+    """Stream path into a sibling temp file, keeping lines newer than cutoff, then swap it in"""
+    tmp_path = path + ".tmp"
+    # The scan runs without the writer's lock so logging and log reads carry on meanwhile
+    try:
+        with open(path, 'rb') as src, open(tmp_path, 'wb') as dst:
+            for line in src:
+                # ISO timestamps of the same format order correctly as bytes
+                timestamp = _line_timestamp(line)
+                if timestamp is None or timestamp >= cutoff:
+                    dst.write(line)
+            scanned = src.tell()
+    except FileNotFoundError:
+        return
+    
+    # Only the catch-up copy and the swap hold the writer off
+    with _log_flush_lock:
+        _flush_logs()
+        # The writer reopens the file after the swap
+        fh = _log_handles.pop(path, None)
+        if fh is not None:
+            fh.close()
+        with open(path, 'rb') as src, open(tmp_path, 'ab') as dst:
+            src.seek(scanned)
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp_path, path)
+
+def cleanup_old_logs(days=LOG_RETENTION_DAYS):
+    """Drop log records older than the retention window from both log files"""
+    cutoff = (datetime.now() - timedelta(days=days)).isoformat(timespec='microseconds').encode()
+    for path in _log_queues:
+        _prune_log_file(path, cutoff)
+
+def retry_on_failure(max_attempts=3, base_delay=0.5, max_delay=30.0, timeout=120.0, exceptions=(Exception,)):
+    """Retry a call on the given exceptions with jittered exponential backoff inside a total time budget"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            deadline = time.monotonic() + timeout
+            for attempt in range(max_attempts):
+                try:
+                    return func(*args, **kwargs)
+                except exceptions:
+                    delay = min(max_delay, base_delay * (1 << attempt)) * random.uniform(0.5, 1.5)
+                    # Give up on the last attempt or when the wait would overrun the budget
+                    if attempt == max_attempts - 1 or time.monotonic() + delay >= deadline:
+                        raise
+                    time.sleep(delay)
+        return wrapper
+    return decorator
+
+_log_listener = None
+
+def configure_logging(level=logging.INFO):
+    """Add a queue-fed stream handler to the root logger; handlers already installed are kept"""
+    global _log_listener
+    root = logging.getLogger()
+    if _log_listener is not None or any(
+            isinstance(h, logging.handlers.QueueHandler) for h in root.handlers):
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    log_queue = queue.SimpleQueue()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+    _log_listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+
+def install_fast_event_loop():
+    """Use uvloop for asyncio when it is installed; returns whether it was enabled"""
+    if uvloop is None:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+def install_shutdown_handlers(callback):
+    """Call callback(signum) once from the running loop on SIGINT/SIGTERM; returns whether installed"""
+    loop = asyncio.get_running_loop()
+    shutting_down = False
+    
+    def on_signal(signum):
+        nonlocal shutting_down
+        # A second signal must not cancel the shutdown already in progress
+        if shutting_down:
+            log_action(f"Shutdown already in progress, ignoring signal {signum}")
+            return
+        shutting_down = True
+        callback(signum)
+    
+    try:
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, on_signal, sig)
+        # systemctl reload sends SIGHUP; log it rather than shut down and close positions
+        if hasattr(signal, 'SIGHUP'):
+            loop.add_signal_handler(signal.SIGHUP, log_action, "Reload signal received (SIGHUP), ignoring")
+    except (NotImplementedError, RuntimeError):
+        # Windows has no loop signal handlers
+        return False
+    return True
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking call in the default executor without stalling the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, partial(func, *args, **kwargs))
 
 def get_recent_logs(n=5):
-    # Placeholder: In production, this should read from a log file or buffer
-    return []
+    """Return the last n action log records, scanning a read-only mapping of the file backwards"""
+    if n <= 0:
+        return []
+    _flush_logs()
+    lines = []
+    try:
+        with open(LOG_FILE, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # end is the exclusive end of the current line, before its newline
+            end = len(mm)
+            if mm[end - 1:end] == b"\n":
+                end -= 1
+            while end > 0 and len(lines) < n:
+                start = mm.rfind(b"\n", 0, end)
+                line = mm[start + 1:end]
+                if line.strip():
+                    lines.append(line)
+                end = start
+    except (FileNotFoundError, ValueError):
+        # ValueError: an empty file cannot be mapped
+        return []
+    
+    records = []
+    for line in reversed(lines):
+        try:
+            records.append(_loads(line))
+        except ValueError:
+            continue
+    return records
+
+@lru_cache(maxsize=4096)
+def _format_currency_cached(cents):
+    return f"${cents / 100:,.2f}"
+
+@lru_cache(maxsize=4096)
+def _format_percentage_cached(hundredths):
+    return f"{hundredths / 100:.2f}%"
 
 def format_currency(value):
-    return f"${value:,.2f}"
+    # Keyed on integer cents so identical balances hit the cache; NaN/inf can't be rounded
+    if not math.isfinite(value):
+        return f"${value:,.2f}"
+    return _format_currency_cached(round(value * 100))
 
 def format_percentage(value):
-    return f"{value:.2f}%"
\ No newline at end of file
+    if not math.isfinite(value):
+        return f"{value:.2f}%"
+    return _format_percentage_cached(round(value * 100))
\ No newline at end of file